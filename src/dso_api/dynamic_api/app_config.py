@@ -13,14 +13,16 @@ class VirtualAppConfig(apps_config.AppConfig):
 
     def __init__(self, apps, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Make django think that App is initiated already.
-        self.models = dict()
         # Path is required for Django to think this APP is real.
         self.path = os.path.dirname(__file__)
 
         self.apps = apps
         apps.app_configs[self.label] = self
 
+        # Make django think that App is initiated already.
+        # This is the same dict that apps.register_model() fills.
+        self.models = apps.all_models.setdefault(self.label, {})
+
         # Disable migrations for this model.
         if not hasattr(settings, "MIGRATION_MODULES"):
             settings.MIGRATION_MODULES = dict()
@@ -40,7 +42,6 @@ class VirtualAppConfig(apps_config.AppConfig):
         Register model in django registry and update models.
         """
         self.apps.register_model(self.label, model)
-        self.models = self.apps.all_models[self.label]
 
 
 def register_model(dataset, model):
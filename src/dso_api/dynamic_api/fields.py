@@ -1,9 +1,77 @@
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.urls import get_script_prefix, reverse
+from django.utils.http import RFC3986_SUBDELIMS
 from rest_framework import serializers
+from rest_framework.reverse import preserve_builtin_query_params
 from rest_framework_dso.fields import LinksField
 from .utils import split_on_separator
 
+URL_PLACEHOLDER = "__PK__"
+URL_SAFE_CHARS = RFC3986_SUBDELIMS + "/~:@"  # same as django.urls.reverse()
+
+
+@lru_cache(maxsize=1024)
+def _get_path_template(view_name, lookup_field, format, script_prefix) -> str:
+    """Reverse the detail URL path, with a placeholder for the object identifier.
+    The script prefix is only part of the cache key, reverse() reads it itself.
+    """
+    kwargs = {lookup_field: URL_PLACEHOLDER}
+    if format:
+        kwargs["format"] = format
+    return reverse(view_name, kwargs=kwargs)
+
+
+def clear_url_templates():
+    """Clear the cached URL templates, e.g. after the URLConf was reloaded."""
+    _get_path_template.cache_clear()
+
+
+def add_query_param(url: str, key, value) -> str:
+    """Add a query parameter to a URL that may already have a query string."""
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}{key}={value}"
+
+
+def split_pk(context: dict, pk):
+    """Split the temporal identifier, reusing earlier results of this serializer run.
+    Several fields of the same object can ask for the same split.
+    """
+    try:
+        pk_splits = context["_pk_splits"]
+    except KeyError:
+        pk_splits = context["_pk_splits"] = {}
+
+    try:
+        return pk_splits[pk]
+    except KeyError:
+        parts = pk_splits[pk] = split_on_separator(pk)
+        return parts
+
 
-class TemporalHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
+class URLTemplateMixin:
+    """Generate detail URLs without resolving the URLConf for every object.
+
+    The URL path is reversed once per view, using a placeholder for
+    the identifier. Each object only needs a string replacement.
+    """
+
+    def reverse_lookup(self, view_name, lookup_value, request, format=None):
+        template = _get_path_template(
+            view_name, self.lookup_field, format, get_script_prefix()
+        )
+        path = template.replace(
+            URL_PLACEHOLDER, quote(str(lookup_value), safe=URL_SAFE_CHARS)
+        )
+
+        # Same as DRF's reverse(), which keeps the ?format= parameter in links.
+        return preserve_builtin_query_params(request.build_absolute_uri(path), request)
+
+
+class TemporalHyperlinkedRelatedField(
+    URLTemplateMixin, serializers.HyperlinkedRelatedField
+):
     """Temporal Hyperlinked Related Field
 
     Usef for forward relations in serializers."""
@@ -14,31 +82,25 @@ class TemporalHyperlinkedRelatedField(serializers.HyperlinkedRelatedField):
 
     def get_url(self, obj, view_name, request, format=None):
         # Unsaved objects will not yet have a valid URL.
-        if hasattr(obj, "pk") and obj.pk in (None, ""):
+        pk = getattr(obj, "pk", None)
+        if pk in (None, ""):
             return None
 
-        if request.versioned and obj.is_temporal():
-            # note that `obj` has only PK field.
-            lookup_value, version = split_on_separator(obj.pk)
-            kwargs = {self.lookup_field: lookup_value}
-
-            base_url = self.reverse(
-                view_name, kwargs=kwargs, request=request, format=format
-            )
-
-            if request.dataset_temporal_slice is None:
-                key = request.dataset.temporal.get("identifier")
-                value = version
-            else:
-                key = request.dataset_temporal_slice["key"]
-                value = request.dataset_temporal_slice["value"]
-            base_url = "{}?{}={}".format(base_url, key, value)
+        if not request.versioned or not obj.is_temporal():
+            return self.reverse_lookup(view_name, pk, request, format)
+
+        # note that `obj` has only PK field.
+        lookup_value, version = split_pk(self.context, pk)
+        base_url = self.reverse_lookup(view_name, lookup_value, request, format)
+
+        temporal_slice = request.dataset_temporal_slice
+        if temporal_slice is None:
+            key = request.dataset.temporal.get("identifier")
+            value = version
         else:
-            kwargs = {self.lookup_field: obj.pk}
-            base_url = self.reverse(
-                view_name, kwargs=kwargs, request=request, format=format
-            )
-        return base_url
+            key = temporal_slice["key"]
+            value = temporal_slice["value"]
+        return add_query_param(base_url, key, value)
 
 
 class TemporalReadOnlyField(serializers.ReadOnlyField):
@@ -52,31 +114,29 @@ class TemporalReadOnlyField(serializers.ReadOnlyField):
             "request" in self.parent.context
             and self.parent.context["request"].versioned
         ):
-            value = split_on_separator(value)[0]
+            value = split_pk(self.parent.context, value)[0]
         return value
 
 
-class TemporalLinksField(LinksField):
+class TemporalLinksField(URLTemplateMixin, LinksField):
     """Versioned Links Field
 
     Correcting URLs inside Links field with proper versions.
     """
 
     def get_url(self, obj, view_name, request, format):
-        if hasattr(obj, "pk") and obj.pk in (None, ""):
+        if getattr(obj, "pk", None) in ("", None):
             return None
 
-        kwargs = {self.lookup_field: obj.pk}
-
-        if request.dataset.temporal is None or not obj.is_temporal():
-            return super().get_url(obj, view_name, request, format)
+        dataset = request.dataset
+        temporal = dataset.temporal
+        if temporal is None or not obj.is_temporal():
+            lookup_value = getattr(obj, self.lookup_field)
+            return self.reverse_lookup(view_name, lookup_value, request, format)
 
-        lookup_value = getattr(obj, request.dataset.identifier)
-        kwargs = {self.lookup_field: lookup_value}
-        base_url = self.reverse(
-            view_name, kwargs=kwargs, request=request, format=format
-        )
+        lookup_value = getattr(obj, dataset.identifier)
+        base_url = self.reverse_lookup(view_name, lookup_value, request, format)
 
-        temporal_identifier = request.dataset.temporal["identifier"]
+        temporal_identifier = temporal["identifier"]
         version = getattr(obj, temporal_identifier)
-        return "{}?{}={}".format(base_url, temporal_identifier, version)
+        return add_query_param(base_url, temporal_identifier, version)
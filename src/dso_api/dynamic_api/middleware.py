@@ -16,10 +16,14 @@ class DatasetMiddleware(BaseMiddleware):
         Make current dataset available across whole application.
         """
         if not hasattr(request, "dataset"):
-            try:
-                request.dataset = view_func.cls.model._dataset_schema
-            except AttributeError:
-                pass
+            view_class = getattr(view_func, "cls", None)
+            dataset = getattr(view_class, "dataset_schema", None)
+            if dataset is None:
+                # Viewsets that are not made by viewset_factory() may only set a model.
+                model = getattr(view_class, "model", None)
+                dataset = getattr(model, "_dataset_schema", None)
+            if dataset is not None:
+                request.dataset = dataset
 
         return None
 
@@ -35,20 +39,29 @@ class TemporalDatasetMiddleware(BaseMiddleware):
         request.dataset_version = None
         request.dataset_temporal_slice = None
 
-        if not hasattr(request, "dataset") or request.dataset.temporal is None:
+        if not hasattr(request, "dataset"):
+            return None
+
+        temporal = request.dataset.temporal
+        if temporal is None:
             return None
 
         request.versioned = True
-        if request.GET.get(request.dataset.temporal["identifier"]):
-            request.dataset_version = request.GET.get(
-                request.dataset.temporal["identifier"]
-            )
-
-        if "dimensions" in request.dataset.temporal:
-            for key, fields in request.dataset.temporal["dimensions"].items():
-                if request.GET.get(key):
-                    request.dataset_temporal_slice = dict(
-                        key=key, value=request.GET.get(key), fields=fields
-                    )
+        req_get = request.GET
+        temporal_keys = getattr(view_func.cls, "temporal_param_keys", None)
+        if temporal_keys is not None and req_get.keys().isdisjoint(temporal_keys):
+            # Most requests don't ask for a specific version.
+            return None
+
+        version = req_get.get(temporal["identifier"])
+        if version:
+            request.dataset_version = version
+
+        for key, fields in temporal.get("dimensions", {}).items():
+            value = req_get.get(key)
+            if value:
+                request.dataset_temporal_slice = dict(
+                    key=key, value=value, fields=fields
+                )
 
         return None
@@ -1,14 +1,17 @@
 import certifi
+import hashlib
 import logging
 import orjson
 import urllib3
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 from rest_framework import status
 from rest_framework.exceptions import NotAuthenticated, NotFound, ParseError
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 from typing import Type, Union
-from urllib.parse import urljoin
+from urllib.parse import quote
 from urllib3 import HTTPResponse
 
 from dso_api.lib.exceptions import (
@@ -21,7 +24,17 @@ from . import serializers
 from .. import permissions
 
 logger = logging.getLogger(__name__)
-http_pool = urllib3.PoolManager(cert_reqs="CERT_REQUIRED", ca_certs=certifi.where())
+
+# A single pool is shared by all remote viewsets. It keeps enough connection
+# pools (one per remote host) and connections to serve concurrent requests.
+http_pool = urllib3.PoolManager(
+    num_pools=32,
+    maxsize=32,
+    block=False,
+    cert_reqs="CERT_REQUIRED",
+    ca_certs=certifi.where(),
+    retries=urllib3.Retry(total=0),
+)
 
 
 def del_none(d):
@@ -29,12 +42,26 @@ def del_none(d):
     Delete keys with the value ``None`` in a dictionary, recursively.
 
     This alters the input so you may wish to ``copy`` the dict first.
+    Dictionaries that are nested inside lists are cleaned as well.
     """
-    for key, value in list(d.items()):
-        if value is None:
-            del d[key]
-        elif isinstance(value, dict):
-            del_none(value)
+    stack = [d]
+    while stack:
+        current = stack.pop()
+        for key in tuple(current):
+            value = current[key]
+            if value is None:
+                del current[key]
+            elif isinstance(value, dict):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(item for item in value if isinstance(item, dict))
+
+
+def _get_meta_keys(headers) -> tuple:
+    """Tell which ``request.META`` key each HTTP header is stored in."""
+    return tuple(
+        (f"HTTP_{header.upper().replace('-', '_')}", header) for header in headers
+    )
 
 
 class RemoteViewSet(ViewSet):
@@ -45,16 +72,26 @@ class RemoteViewSet(ViewSet):
     dataset_id = None
     table_id = None
 
+    #: Static headers, already encoded as they're sent with every request.
     default_headers = {
-        "Accept": "application/json; charset=utf-8",
+        "Accept": b"application/json; charset=utf-8",
         # "MKS_APPLICATIE": "...",
         # "MKS_GEBRUIKER": "...",
     }
     headers_passthrough = ("Authorization",)
 
+    #: The ``request.META`` keys of the ``headers_passthrough``.
+    #: This is recalculated for each subclass, see ``__init_subclass__()``.
+    headers_passthrough_meta = _get_meta_keys(headers_passthrough)
+
     #: Custom permission that checks amsterdam schema auth settings
     permission_classes = [permissions.HasOAuth2Scopes]
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Keep the META keys in sync with a changed headers_passthrough.
+        cls.headers_passthrough_meta = _get_meta_keys(cls.headers_passthrough)
+
     def get_serializer(self, *args, **kwargs) -> serializers.RemoteSerializer:
         """Instantiate the serializer that validates the remote data."""
         if self.serializer_class is None:
@@ -109,23 +146,35 @@ class RemoteViewSet(ViewSet):
 
     def _call_remote(self, url="") -> Union[dict, list]:
         """Make a request to the remote server"""
-        if not self.endpoint_url:
+        endpoint_url = self.endpoint_url
+        if not endpoint_url:
             raise ImproperlyConfigured(
                 f"{self.__class__.__name__}.endpoint_url is not set"
             )
 
         if not url:
-            url = self.endpoint_url
+            url = endpoint_url
         else:
-            url = urljoin(self.endpoint_url, url)
+            url = f"{endpoint_url.rstrip('/')}/{quote(str(url), safe='')}"
 
         # Using urllib directly instead of requests for performance
         logger.debug("Forwarding call to %s", url)
         headers = self.get_headers()
+        cached = self._get_cached_response(url, headers)
         try:
             response: HTTPResponse = http_pool.request(
-                "GET", url, headers=headers, timeout=60, retries=False,
+                "GET",
+                url,
+                headers=headers,
+                timeout=60,
+                retries=False,
+                preload_content=False,
             )
+            try:
+                # Read the body only once, and return the connection to the pool
+                data = response.read(decode_content=True)
+            finally:
+                response.release_conn()
         except (TimeoutError, urllib3.exceptions.TimeoutError) as e:
             # Socket timeout
             logger.error("Proxy call failed, timeout from remote server: %s", e)
@@ -136,11 +185,52 @@ class RemoteViewSet(ViewSet):
             raise ServiceUnavailable(str(e)) from e
 
         if response.status == 200:
-            return orjson.loads(response.data)
-
-        return self._raise_http_error(response)
+            json_data = orjson.loads(data)
+            self._set_cached_response(url, headers, response, json_data)
+            return json_data
+        elif response.status == 304 and cached is not None:
+            # Not modified, can reuse the previous response.
+            return cached[2]
+
+        return self._raise_http_error(response, data)
+
+    def _get_cache_key(self, url, headers) -> str:
+        """The cache key is unique per user, without storing the token itself."""
+        authorization = headers.get("Authorization", b"")
+        digest = hashlib.sha256(url.encode() + b"\0" + authorization).hexdigest()
+        return f"dso_api.remote:{digest}"
+
+    def _get_cached_response(self, url, headers):
+        """Find the previous response, and turn the request into a conditional GET.
+        This is only active with ``settings.REMOTE_CACHE_ENABLED``.
+        """
+        if not settings.REMOTE_CACHE_ENABLED:
+            return None
+
+        cached = cache.get(self._get_cache_key(url, headers))
+        if cached is not None:
+            etag, last_modified, json_data = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return cached
+
+    def _set_cached_response(self, url, headers, response: HTTPResponse, json_data):
+        """Store the response, if the remote server allows to revalidate it."""
+        if not settings.REMOTE_CACHE_ENABLED:
+            return
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache.set(
+                self._get_cache_key(url, headers),
+                (etag, last_modified, json_data),
+                timeout=settings.REMOTE_CACHE_TIMEOUT,
+            )
 
-    def _raise_http_error(self, response: HTTPResponse):  # noqa: C901
+    def _raise_http_error(self, response: HTTPResponse, data: bytes):  # noqa: C901
         """Translate the remote HTTP error to the proper response.
 
         This translates some errors into a 502 "Bad Gateway" or 503 "Gateway Timeout"
@@ -148,60 +238,64 @@ class RemoteViewSet(ViewSet):
         """
         # Generic logging
         level = logging.ERROR if response.status >= 500 else logging.DEBUG
-        logger.log(
-            level, "Proxy call failed, status %s: %s", response.status, response.reason
-        )
+        if logger.isEnabledFor(level):
+            logger.log(
+                level,
+                "Proxy call failed, status %s: %s",
+                response.status,
+                response.reason,
+            )
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug("  Response body: %s", response.data)
+            logger.debug("  Response body: %s", data)
 
         content_type = response.headers.get("content-type", "")
-        if content_type.startswith("text/html"):
-            # HTML error, probably hit the completely wrong page.
-            detail_message = None
-        else:
-            # Consider the actual JSON response to be relevant here.
-            detail_message = response.data.decode()
+
+        def get_detail_message():
+            # Only decoded by the code paths that actually use the message.
+            if content_type.startswith("text/html"):
+                # HTML error, probably hit the completely wrong page.
+                return None
+            else:
+                # Consider the actual JSON response to be relevant here.
+                return data.decode()
 
         if 300 <= response.status <= 399 and (
             "/oauth/authorize" in response.headers.get("Location", "")
         ):
             raise NotAuthenticated("Invalid token")
+        elif response.status == 400 and data == b"Missing required MKS headers":
+            # Didn't pass the MKS_APPLICATIE / MKS_GEBRUIKER headers.
+            # Shouldn't occur anymore since it's JWT-token based now.
+            raise NotAuthenticated("Internal credentials are missing")
+        elif (
+            response.status in (400, 404) and content_type == "application/problem+json"
+        ):
+            # Translate proper "Bad Request" / "Not Found" to a REST response,
+            # forwarding the problem-json details with the same status code.
+            drf_exception = ParseError if response.status == 400 else NotFound
+            raise RemoteAPIException(
+                title=drf_exception.default_detail,
+                detail=orjson.loads(data),
+                code=drf_exception.default_code,
+                status_code=response.status,
+            )
         elif response.status == 400:  # "bad request"
-            if response.data == b"Missing required MKS headers":
-                # Didn't pass the MKS_APPLICATIE / MKS_GEBRUIKER headers.
-                # Shouldn't occur anymore since it's JWT-token based now.
-                raise NotAuthenticated("Internal credentials are missing")
-            elif content_type == "application/problem+json":
-                # Translate proper "Bad Request" to REST response
-                raise RemoteAPIException(
-                    title=ParseError.default_detail,
-                    detail=orjson.loads(response.data),
-                    code=ParseError.default_code,
-                    status_code=400,
-                )
-            else:
-                raise BadGateway(detail_message)
+            raise BadGateway(get_detail_message())
         elif response.status == 403:  # "forbidden"
             # Return 403 to client as well
-            raise NotAuthenticated(detail_message)
+            raise NotAuthenticated(get_detail_message())
         elif response.status == 404:  # "not found"
             # Return 404 to client (in DRF format)
-            if content_type == "application/problem+json":
-                # Forward the problem-json details, but still in a 404:
-                raise RemoteAPIException(
-                    title=NotFound.default_detail,
-                    detail=orjson.loads(response.data),
-                    status_code=404,
-                    code=NotFound.default_code,
-                )
-            raise NotFound(detail_message)
+            raise NotFound(get_detail_message())
         else:
             # Unexpected response, call it a "Bad Gateway"
-            logger.error(
-                "Proxy call failed, unexpected status code from endpoint: %s %s",
-                response.status,
-                detail_message,
-            )
+            detail_message = get_detail_message()
+            if logger.isEnabledFor(logging.ERROR):
+                logger.error(
+                    "Proxy call failed, unexpected status code from endpoint: %s %s",
+                    response.status,
+                    detail_message,
+                )
             raise BadGateway(
                 detail_message
                 or f"Unexpected HTTP {response.status} from internal endpoint"
@@ -209,33 +303,39 @@ class RemoteViewSet(ViewSet):
 
     def get_headers(self):  # noqa: C901
         """Collect the headers to submit to the remote service."""
-        client_ip = self.request.META["REMOTE_ADDR"]
-        if isinstance(client_ip, str):
+        meta = self.request.META
+        meta_get = meta.get
+        client_ip = meta["REMOTE_ADDR"]
+        try:
             client_ip = client_ip.encode("iso-8859-1")
-        forward = self.request.META.get("HTTP_X_FORWARDED_FOR", "")
+        except AttributeError:
+            pass  # already bytes
+
+        forward = meta_get("HTTP_X_FORWARDED_FOR", "")
         if forward:
-            if isinstance(forward, str):
+            try:
                 forward = forward.encode("iso-8859-1")
-            forward = b"%b %b" % (forward, client_ip)
+            except AttributeError:
+                pass
+            # X-Forwarded-For uses a comma separated list of addresses.
+            forward = b", ".join((forward, client_ip))
         else:
             forward = client_ip
 
-        headers = {
-            **self.default_headers,
-            "X-Forwarded-For": forward,
-        }
+        headers = self.default_headers.copy()
+        headers["X-Forwarded-For"] = forward
 
         # We check if we already have a X-Correlation-ID header
-        x_correlation_id = self.request.META.get("HTTP_X_CORRELATION_ID")
+        x_correlation_id = meta_get("HTTP_X_CORRELATION_ID")
         if not x_correlation_id:
             # Otherwise we set it to the X-Unique-ID header
-            x_correlation_id = self.request.META.get("HTTP_X_UNIQUE_ID")
+            x_correlation_id = meta_get("HTTP_X_UNIQUE_ID")
         if x_correlation_id:
             # And if defined pass on to the destination
             headers["X-Correlation-ID"] = x_correlation_id.encode("iso-8859-1")
 
-        for header in self.headers_passthrough:
-            value = self.request.headers.get(header, "")
+        for meta_key, header in self.headers_passthrough_meta:
+            value = meta_get(meta_key)
             if not value:
                 continue
 
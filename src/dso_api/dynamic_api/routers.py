@@ -13,6 +13,7 @@ from schematools.contrib.django.models import Dataset
 from schematools.utils import to_snake_case
 
 from dso_api.dynamic_api.app_config import register_model
+from dso_api.dynamic_api.fields import clear_url_templates
 from dso_api.dynamic_api.locking import lock_for_writing
 from dso_api.dynamic_api.oas3 import get_openapi_json_view
 from dso_api.dynamic_api.remote import remote_serializer_factory, remote_viewset_factory
@@ -169,6 +170,7 @@ class DynamicRouter(routers.DefaultRouter):
 
         # Clear caches
         serializer_factory.cache_clear()
+        clear_url_templates()
         self.all_models.clear()
 
         # Clear models from the Django App registry cache for removed apps
@@ -215,6 +217,7 @@ class DynamicRouter(routers.DefaultRouter):
 
         # Clear the LRU-cache
         serializer_factory.cache_clear()
+        clear_url_templates()
 
         # Refresh URLConf in urls.py
         urls.refresh_urls(self)
@@ -222,4 +225,5 @@ class DynamicRouter(routers.DefaultRouter):
     def _prune_app_registry(self, old_dynamic_apps: set):
         """Clear models from the Django App registry cache if they are no longer used."""
         for removed_app in old_dynamic_apps - set(self.all_models.keys()):
-            del apps.all_models[removed_app]
+            # Clear instead of delete, as VirtualAppConfig.models refers to it.
+            apps.all_models[removed_app].clear()
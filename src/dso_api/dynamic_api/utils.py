@@ -2,8 +2,6 @@ import re
 
 RE_CAMELIZE = re.compile(r"[a-z0-9]_[a-z0-9]")
 
-PK_SPLIT = re.compile("[_.]")
-
 
 def _underscore_to_camel(match):
     chars = match.group()  # take complete match, it's only 3 chars
@@ -22,5 +20,8 @@ def snake_to_camel_case(key: str) -> str:
 
 
 def split_on_separator(instr):
-    # reversal is king
-    return [part[::-1] for part in PK_SPLIT.split(instr[::-1], 1)][::-1]
+    """Split the value on the last "_" or "." separator."""
+    pos = max(instr.rfind("_"), instr.rfind("."))
+    if pos == -1:
+        return [instr]
+    return [instr[:pos], instr[pos + 1 :]]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from collections import UserList
-from typing import List, Type, Union
+from typing import List, Optional, Type, Union
 
 from django.contrib.gis.db.models import GeometryField
 from django.db import models
@@ -19,6 +19,7 @@ from gisserver.features import (
 )
 from gisserver.views import WFSView
 from schematools.contrib.django.models import Dataset, DynamicModel
+from schematools.types import DatasetSchema
 from rest_framework import viewsets, status
 from rest_framework_dso import crs, fields
 from rest_framework_dso.pagination import DSOPageNumberPagination
@@ -138,9 +139,15 @@ class DynamicApiViewSet(
     #: Define the model class to use (e.g. in .as_view() call / subclass)
     model: Type[DynamicModel] = None
 
+    #: The schema of the dataset, which the middleware exposes as request.dataset
+    dataset_schema: DatasetSchema = None
+
     #: Custom permission that checks amsterdam schema auth settings
     permission_classes = [permissions.HasOAuth2Scopes]
 
+    #: The query parameters that select a version of temporal objects.
+    temporal_param_keys: Optional[frozenset] = None
+
 
 def _get_viewset_api_docs(
     serializer_class: Type[serializers.DynamicSerializer],
@@ -189,6 +196,16 @@ def _get_ordering_fields(
     ]
 
 
+def _get_temporal_param_keys(model: Type[DynamicModel]) -> Optional[frozenset]:
+    """Tell which query parameters select a version of the temporal objects.
+    This allows the middleware to skip requests without such parameters.
+    """
+    temporal = model._dataset_schema.temporal
+    if temporal is None:
+        return None
+    return frozenset([temporal["identifier"], *temporal.get("dimensions", {})])
+
+
 def viewset_factory(model: Type[DynamicModel]) -> Type[DynamicApiViewSet]:
     """Generate the viewset for a schema."""
     serializer_class = serializers.serializer_factory(model, 0)
@@ -200,10 +217,12 @@ def viewset_factory(model: Type[DynamicModel]) -> Type[DynamicApiViewSet]:
             serializer_class, filterset_class, ordering_fields
         ),
         "model": model,
+        "dataset_schema": model._dataset_schema,
         "queryset": model.objects.all(),  # also for OpenAPI schema parsing.
         "serializer_class": serializer_class,
         "filterset_class": filterset_class,
         "ordering_fields": ordering_fields,
+        "temporal_param_keys": _get_temporal_param_keys(model),
     }
     return type(f"{model.__name__}ViewSet", (DynamicApiViewSet,), attrs)
 
@@ -248,3 +248,7 @@ DATAPUNT_AUTHZ = {
 # -- Local app settings
 
 AMSTERDAM_SCHEMA = {"geosearch_disabled_datasets": ["bag", "meetbouten"]}
+
+# Cache remote API responses, and revalidate them with a conditional GET.
+REMOTE_CACHE_ENABLED = env.bool("REMOTE_CACHE_ENABLED", False)
+REMOTE_CACHE_TIMEOUT = env.int("REMOTE_CACHE_TIMEOUT", 60 * 60)
@@ -3,10 +3,11 @@
 This implements the filtering and ordering spec.
 DSO 1.1 Spec: "2.6.6 Filteren, sorteren en zoeken"
 """
+import copy
 import re
 import operator
 from datetime import datetime
-from functools import reduce
+from functools import lru_cache, reduce
 from typing import Type
 
 from django import forms
@@ -17,7 +18,6 @@ from django.db import models
 from django.db.models import Q, expressions, lookups
 from django.forms import widgets
 from django.utils.functional import cached_property
-from django.utils.translation import ugettext_lazy as _
 from django_filters import fields
 from django_filters.constants import EMPTY_VALUES
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet, filters
@@ -35,59 +35,70 @@ __all__ = [
     "RangeFilter",
 ]
 
+# Input formats for the geometry [contains] filter: "x,y" and "POINT(x y)".
+_NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+_POINT_RE = re.compile(r"POINT\(([-+]?\d+(?:\.\d+)?) ([-+]?\d+(?:\.\d+)?)\)")
 
-def _valid_rd(x, y):
-    """
-    Check valid RD x, y coordinates
-    """
-
-    rd_x_min = 0
-    rd_y_min = 300000
-    rd_x_max = 280000
-    rd_y_max = 625000
+# Escape the SQL LIKE characters, and replace wildcard chars with SQL LIKE logic.
+# This happens in a single pass, so the escaped values are not replaced again.
+# Not using r"\" here as that is a syntax error.
+_WILDCARD_TABLE = str.maketrans(
+    {"\\": "\\\\", "%": r"\%", "_": r"\_", "*": "%", "?": "_"}
+)
 
-    if not rd_x_min <= x <= rd_x_max:
-        return False
+# The field names are a limited set, so the regex work can be cached.
+# The maxsize protects against unlimited growth from random ?_sort=... values.
+_to_snake_case = lru_cache(maxsize=2048)(to_snake_case)
 
-    if not rd_y_min <= y <= rd_y_max:
-        return False
 
-    return True
+# Bounding box of the Netherlands, for RD (EPSG:28992) and WGS84 (EPSG:4326)
+_RD_X_MIN = 0.0
+_RD_X_MAX = 280000.0
+_RD_Y_MIN = 300000.0
+_RD_Y_MAX = 625000.0
+_LAT_MIN = 50.803721015
+_LAT_MAX = 53.5104033474
+_LON_MIN = 3.31497114423
+_LON_MAX = 7.09205325687
 
 
-def _valid_lat_lon(lat, lon):
+def _parse_x_y(value):
+    """Parse the "x,y" or "POINT(x y)" notation of the [contains] filter.
+    This returns ``None, None`` for other notations.
     """
-    Check if lat/lon is in the Netherlands bounding box
-    """
-    lat_min = 50.803721015
-    lat_max = 53.5104033474
-    lon_min = 3.31497114423
-    lon_max = 7.09205325687
-
-    if not lat_min <= lat <= lat_max:
-        return False
-
-    if not lon_min <= lon <= lon_max:
-        return False
-
-    return True
+    if "," in value:
+        # Common case, only needs a simple pattern for each number.
+        # These values end up in WKT, so float() is too permissive (e.g. "1_0").
+        x, y = value.split(",", 1)
+        x = x.strip()
+        y = y.strip()
+        if _NUMBER_RE.fullmatch(x) and _NUMBER_RE.fullmatch(y):
+            return x, y
+        return None, None
+    elif m := _POINT_RE.match(value):
+        return m.group(1), m.group(2)
+    else:
+        return None, None
 
 
 def _validate_convert_x_y(x, y, srid):
+    """Detect which coordinate system and axis order the x,y values are given in.
+    The values are checked against the bounding box of the Netherlands.
+    """
     fx = float(x)
     fy = float(y)
     x_lon = y_lat = None
     if not srid or srid == 4326:
-        if _valid_lat_lon(fx, fy):
+        if _LAT_MIN <= fx <= _LAT_MAX and _LON_MIN <= fy <= _LON_MAX:
             x_lon = y
             y_lat = x
             srid = 4326
-        elif _valid_lat_lon(fy, fx):
+        elif _LAT_MIN <= fy <= _LAT_MAX and _LON_MIN <= fx <= _LON_MAX:
             x_lon = x
             y_lat = y
             srid = 4326
     if not srid or srid == 28992:
-        if _valid_rd(fx, fy):
+        if _RD_X_MIN <= fx <= _RD_X_MAX and _RD_Y_MIN <= fy <= _RD_Y_MAX:
             x_lon = x
             y_lat = y
             srid = 28992
@@ -124,14 +135,20 @@ class NotEqual(lookups.Lookup):
         """Generate the required SQL."""
         # Need to extract metadata from lhs, so parsing happens inline
         lhs = self.lhs  # typically a Col(alias, target) object
-        if hasattr(lhs, "resolve_expression"):
-            lhs = lhs.resolve_expression(compiler.query)
+        resolve_expression = getattr(lhs, "resolve_expression", None)
+        if resolve_expression is not None:
+            lhs = resolve_expression(compiler.query)
 
-        lhs_field = lhs
-        while isinstance(lhs_field, expressions.Func):
-            # Allow date_field__day__not=12 to return None values
-            lhs_field = lhs_field.source_expressions[0]
-        lhs_nullable = lhs_field.target.null
+        try:
+            lhs_nullable = self._lhs_nullable
+        except AttributeError:
+            # The lookup is shared between cloned querysets (e.g. the pagination
+            # count query), so only walk the expressions on the first compile.
+            lhs_field = lhs
+            while isinstance(lhs_field, expressions.Func):
+                # Allow date_field__day__not=12 to return None values
+                lhs_field = lhs_field.source_expressions[0]
+            lhs_nullable = self._lhs_nullable = lhs_field.target.null
 
         # Generate the SQL-prepared values
         lhs, lhs_params = self.process_lhs(compiler, connection, lhs=lhs)  # (field, [])
@@ -169,18 +186,7 @@ class Wildcard(lookups.Lookup):
 
     def get_db_prep_lookup(self, value, connection):
         """Apply the wildcard logic to the right-hand-side value"""
-        value = (
-            value
-            # Escape % and _ first.
-            # Not using r"\" here as that is a syntax error.
-            .replace("\\", "\\\\")
-            .replace("%", r"\%")
-            .replace("_", r"\_")
-            # Replace wildcard chars with SQL LIKE logic
-            .replace("*", "%")
-            .replace("?", "_")
-        )
-        return "%s", [value]
+        return "%s", [value.translate(_WILDCARD_TABLE)]
 
 
 class WildcardCharFilter(filters.CharFilter):
@@ -207,6 +213,22 @@ class MultipleValueWidget(widgets.Input):
             return [value] if value is not None else None
 
 
+# The form field settings that MultipleValueField takes over from the subfield.
+_COPIED_ATTRS = (
+    "required",
+    "widget",
+    "label",
+    "initial",
+    "help_text",
+    "error_messages",
+    "show_hidden_initial",
+    "validators",
+    "localize",
+    "disabled",
+    "label_suffix",
+)
+
+
 class MultipleValueField(forms.Field):
     """Form field that returns all values."""
 
@@ -214,22 +236,11 @@ class MultipleValueField(forms.Field):
     widget = MultipleValueWidget
 
     def __init__(self, subfield: forms.Field, **kwargs):
-        safe_kwargs = {
-            k: kwargs.get(k, getattr(subfield, k, None))
-            for k in (
-                "required",
-                "widget",
-                "label",
-                "initial",
-                "help_text",
-                "error_messages",
-                "show_hidden_initial",
-                "validators",
-                "localize",
-                "disabled",
-                "label_suffix",
+        safe_kwargs = {}
+        for attr in _COPIED_ATTRS:
+            safe_kwargs[attr] = (
+                kwargs[attr] if attr in kwargs else getattr(subfield, attr, None)
             )
-        }
         super().__init__(**safe_kwargs)
         self.subfield = subfield
 
@@ -290,17 +301,29 @@ class MultipleValueFilter(filters.Filter):
         )
         self.value_filter = value_filter
         self.operator = operator
+        if self.method is None:
+            # Otherwise, filter() is already replaced by a FilterMethod.
+            self.filter = self._make_filter()
 
-    def filter(self, qs, value):
-        if value in EMPTY_VALUES:
-            return qs
-        if self.distinct:
-            qs = qs.distinct()
-
+    def _make_filter(self):
+        """Generate the filter function, with all settings as local variables.
+        The settings are fixed once the filter is constructed.
+        """
         lookup = f"{self.field_name}__{self.lookup_expr}"
         op = self.OPERATORS[self.operator]
-        q = reduce(op, (Q(**{lookup: subvalue}) for subvalue in value))
-        return self.get_method(qs)(q)
+        distinct = self.distinct
+        method_name = "exclude" if self.exclude else "filter"
+
+        def filter(qs, value):
+            if value in EMPTY_VALUES:
+                return qs
+            if distinct:
+                qs = qs.distinct()
+
+            q = reduce(op, (Q(**{lookup: subvalue}) for subvalue in value))
+            return getattr(qs, method_name)(q)
+
+        return filter
 
 
 class RangeFilter(filters.CharFilter):
@@ -329,11 +352,9 @@ class RangeFilter(filters.CharFilter):
         )
 
     def convert_field_name(self, field_name):
-        if "." in field_name:
-            return "__".join(
-                [self.convert_field_name(part) for part in field_name.split(".")]
-            )
-        return to_snake_case(field_name)
+        if "." not in field_name:
+            return _to_snake_case(field_name)
+        return "__".join([_to_snake_case(part) for part in field_name.split(".")])
 
 
 class ModelIdChoiceField(fields.ModelChoiceField):
@@ -369,18 +390,32 @@ class FlexDateTimeField(fields.IsoDateTimeField):
     """Allow input both as date or full datetime"""
 
     default_error_messages = {
-        "invalid": _("Enter a valid ISO date-time, or single date."),
+        "invalid": "Enter a valid ISO date-time, or single date.",
     }
 
+    #: The date-only formats, resolved on first use as these settings are lazy.
+    _date_only_formats = None
+
     @cached_property
     def input_formats(self):
-        # Note these types are lazy, hence the casts
-        return list(fields.IsoDateTimeField.input_formats) + list(
-            filters.DateFilter.field_class.input_formats
+        # Note these types are lazy, hence the unpacking into a tuple.
+        # The order is kept, as the formats are tried in sequence.
+        return (
+            *fields.IsoDateTimeField.input_formats,
+            *filters.DateFilter.field_class.input_formats,
         )
 
+    @classmethod
+    def get_date_only_formats(cls) -> frozenset:
+        """Tell which input formats only describe a date."""
+        if cls._date_only_formats is None:
+            cls._date_only_formats = frozenset(
+                filters.DateFilter.field_class.input_formats
+            )
+        return cls._date_only_formats
+
     def strptime(self, value, format):
-        if format in set(filters.DateFilter.field_class.input_formats):
+        if format in self.get_date_only_formats():
             # Emulate forms.DateField.strptime()
             return datetime.strptime(value, format).date()
         else:
@@ -392,6 +427,10 @@ class FlexDateTimeFilter(filters.IsoDateTimeFilter):
 
     field_class = FlexDateTimeField
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._qs_method_name = "exclude" if self.exclude else "filter"
+
     def filter(self, qs, value):
         """Implement filtering on single day for a 'datetime' field."""
         if value in EMPTY_VALUES:
@@ -403,33 +442,43 @@ class FlexDateTimeFilter(filters.IsoDateTimeFilter):
             # When something different then a full datetime is given, only compare dates.
             # Otherwise, the "lte" comparison happens against 00:00:00.000 of that date,
             # instead of anything that includes that day itself.
-            lookup = f"date__{self.lookup_expr}"
+            lookup = self._date_lookup
         else:
-            lookup = self.lookup_expr
+            lookup = self._datetime_lookup
 
-        return self.get_method(qs)(**{f"{self.field_name}__{lookup}": value})
+        return getattr(qs, self._qs_method_name)(**{lookup: value})
+
+    @cached_property
+    def _date_lookup(self):
+        return f"{self.field_name}__date__{self.lookup_expr}"
+
+    @cached_property
+    def _datetime_lookup(self):
+        return f"{self.field_name}__{self.lookup_expr}"
 
 
 class CharArrayField(forms.CharField):
     """Comma separated strings field"""
 
     default_error_messages = {
-        "invalid_choice": _(
+        "invalid_choice": (
             "Select a valid choice. %(value)s is not one of the available choices."
         ),
-        "invalid_list": _("Enter a list of values."),
+        "invalid_list": "Enter a list of values.",
     }
 
     def to_python(self, value):
         if not value:
-            value = []
+            return []
         elif isinstance(value, str):
-            value = value.split(",")
-        elif not isinstance(value, (list, tuple)):
+            # Common case, the split values are already strings.
+            return value.split(",")
+        elif isinstance(value, (list, tuple)):
+            return [val if type(val) is str else str(val) for val in value]
+        else:
             raise ValidationError(
                 self.error_messages["invalid_list"], code="invalid_list"
             )
-        return [str(val) for val in value]
 
 
 class CharArrayFilter(filters.BaseCSVFilter, filters.CharFilter):
@@ -536,6 +585,23 @@ class DSOFilterSet(FilterSet):
 
         return filter_class, params
 
+    @classmethod
+    def _geometry_contains_filter_names(cls) -> frozenset:
+        """Tell which filters support the ``x,y`` / ``POINT(x y)`` notation."""
+        try:
+            # Stored on the class itself, so it's released with the class
+            # (e.g. when the dynamic filtersets are regenerated).
+            return cls.__dict__["_geometry_contains_names"]
+        except KeyError:
+            names = frozenset(
+                name
+                for name, filter_instance in cls.base_filters.items()
+                if name.endswith("[contains]")
+                and isinstance(filter_instance, GeometryFilter)
+            )
+            cls._geometry_contains_names = names
+            return names
+
     @classmethod
     def get_filter_help_text(
         cls, filter_class: Type[filters.Filter], lookup_type, params
@@ -585,41 +651,52 @@ class DSOFilterSetBackend(DjangoFilterBackend):
 
     def get_filterset(self, request, queryset, view):
         filterset = super().get_filterset(request, queryset, view)
-        for name, value in filterset.data.items():
-            if (
-                name.endswith("[contains]")
-                and name in filterset.base_filters
-                and filterset.base_filters[name].__class__.__name__.endswith(
-                    "GeometryFilter"
-                )
-            ):
-                if value:
-                    if m1 := re.match(
-                        r"([-+]?\d*(?:\.\d+)?),([-+]?\d+(?:\.\d+)?)", value
-                    ):
-                        x = m1.group(1)
-                        y = m1.group(2)
-                    elif m1 := re.match(
-                        r"POINT\(([-+]?\d+(?:\.\d+))? ([-+]?\d+(?:\.\d+))\)", value
-                    ):
-                        x = m1.group(1)
-                        y = m1.group(2)
-                    else:
-                        continue
-                    if x and y:
-                        srid = request.accept_crs.srid if request.accept_crs else None
-                        x_lon, y_lat, srid = _validate_convert_x_y(x, y, srid)
-                        if srid in (4326, 28992) and (x_lon is None or y_lat is None):
-                            raise ValueError(f"Invalid x,y values : {x},{y}")
-                        # longitude, latitude for 4326 x,y otherwise
-                        value = GEOSGeometry(f"POINT({x_lon} {y_lat})", srid)
-                        new_data = filterset.data.copy()
-                        new_data[name] = value
-                        filterset.data = new_data
-
+        names = type(filterset)._geometry_contains_filter_names()
+        if not names:
+            # Most endpoints don't have a geometry field to search on.
+            return filterset
+
+        new_data = None
+        for name in names.intersection(filterset.data):
+            value = filterset.data[name]
+            if value:
+                x, y = _parse_x_y(value)
+                if x and y:
+                    srid = request.accept_crs.srid if request.accept_crs else None
+                    x_lon, y_lat, srid = _validate_convert_x_y(x, y, srid)
+                    if srid in (4326, 28992) and (x_lon is None or y_lat is None):
+                        raise ValueError(f"Invalid x,y values : {x},{y}")
+                    # longitude, latitude for 4326 x,y otherwise
+                    value = GEOSGeometry(f"POINT({x_lon} {y_lat})", srid)
+                    if new_data is None:
+                        # Copy once, as request.GET is immutable and shared with
+                        # other code. A shallow copy is sufficient here, as the
+                        # value lists are replaced instead of being changed.
+                        new_data = copy.copy(filterset.data)
+                    new_data[name] = value
+
+        if new_data is not None:
+            filterset.data = new_data
         return filterset
 
 
+def _get_valid_ordering_fields(view_class) -> frozenset:
+    """Tell which fields can be used for ordering in a view class.
+    This follows the logic of ``OrderingFilter.get_valid_fields()``.
+    The result is stored on the view class, so it's released with the class
+    (e.g. when the dynamic viewsets are regenerated).
+    """
+    try:
+        return view_class.__dict__["_valid_ordering_fields"]
+    except KeyError:
+        valid_fields = frozenset(
+            item if isinstance(item, str) else item[0]
+            for item in view_class.ordering_fields
+        )
+        view_class._valid_ordering_fields = valid_fields
+        return valid_fields
+
+
 class DSOOrderingFilter(OrderingFilter):
     """DRF Ordering filter, following the DSO spec.
     Usage in views::
@@ -647,13 +724,25 @@ class DSOOrderingFilter(OrderingFilter):
 
         # convert to snake_case, preserving `-` if needed
         correct_ordering = [
-            "-".join([to_snake_case(y) for y in x.split("-")]) for x in ordering
+            "-".join([_to_snake_case(y) for y in x.split("-")]) for x in ordering
         ]
         return correct_ordering
 
     def remove_invalid_fields(self, queryset, fields, view, request):
         """Raise errors for invalid parameters instead of silently dropping them."""
-        cleaned = super().remove_invalid_fields(queryset, fields, view, request)
+        ordering_fields = getattr(view, "ordering_fields", None)
+        is_class_attr = "ordering_fields" not in vars(view)
+        if is_class_attr and isinstance(ordering_fields, (list, tuple)):
+            # Static list of fields, which can be cached per view class.
+            # (otherwise the fields are based on the request, e.g. the serializer)
+            valid_fields = _get_valid_ordering_fields(type(view))
+            cleaned = [
+                term
+                for term in fields
+                if (term[1:] if term.startswith("-") else term) in valid_fields
+            ]
+        else:
+            cleaned = super().remove_invalid_fields(queryset, fields, view, request)
         if cleaned != fields:
             invalid = ", ".join(sorted(set(fields).difference(cleaned)))
             raise ValidationError(f"Invalid sort fields: {invalid}", code="order-by")
@@ -1,11 +1,13 @@
 import time
 import json
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
 from unittest import mock
 
 import pytest
 from jwcrypto.jwt import JWT
+from django.apps import apps
 from django.core.handlers.wsgi import WSGIRequest
 from django.db import connection
 from django.utils.timezone import now
@@ -17,12 +19,26 @@ from authorization_django import jwks
 from schematools.contrib.django.models import Dataset
 from schematools.contrib.django.db import create_tables
 from schematools.types import DatasetSchema
+from schematools.utils import to_snake_case
 from rest_framework_dso.crs import RD_NEW
 from tests.test_rest_framework_dso.models import Category, Movie, Location
 
 HERE = Path(__file__).parent
 
 
+@lru_cache()
+def _read_file(path: Path) -> str:
+    return path.read_text()
+
+
+def read_schema_file(filename) -> dict:
+    """Read a schema file from the 'files' folder.
+    The file contents are cached, but each call returns a new dict
+    so tests can still alter the schema data.
+    """
+    return json.loads(_read_file(HERE / "files" / filename))
+
+
 @pytest.fixture()
 def api_rf() -> APIRequestFactory:
     """Request factory for APIView classes"""
@@ -79,9 +95,69 @@ def router():
         router.clear_urls()
 
 
+#: The schema files of the dynamic models, which have their tables created once.
+DYNAMIC_SCHEMA_FILES = (
+    "afval.json",
+    "bommen.json",
+    "parkeervakken.json",
+    "bagh.json",
+    "vestiging.json",
+    "fietspaaltjes.json",
+    "fietspaaltjes_no_display.json",
+    "explosieven.json",
+    "indirect-self-ref.json",
+)
+
+
+def _drop_dataset_tables(schemas):
+    """Drop all tables of the datasets, including tables of older schema versions."""
+    prefixes = tuple(f"{to_snake_case(schema.id)}_" for schema in schemas)
+    table_names = [
+        name
+        for name in connection.introspection.table_names()
+        if name.startswith(prefixes)
+    ]
+    if table_names:
+        with connection.cursor() as cursor:
+            quoted = ", ".join(connection.ops.quote_name(name) for name in table_names)
+            cursor.execute(f"DROP TABLE IF EXISTS {quoted} CASCADE")
+
+
+@pytest.fixture(scope="session")
+def dynamic_tables(django_db_setup, django_db_blocker):
+    """Create the tables of the dynamic models once per test session.
+
+    These are created outside the transaction of a test,
+    so they're shared by all tests instead of being rolled back each time.
+    The tables are dropped afterwards, so a reused test database (--reuse-db)
+    always gets the tables of the current schema files.
+    """
+    schemas = [
+        DatasetSchema.from_dict(read_schema_file(filename))
+        for filename in DYNAMIC_SCHEMA_FILES
+    ]
+    with django_db_blocker.unblock():
+        # Also removes leftovers of an interrupted test run.
+        _drop_dataset_tables(schemas)
+        for schema in schemas:
+            create_tables(schema)
+
+            # create_tables() registers its models in the app registry.
+            # Remove them, so relations of the models that the router creates
+            # later don't resolve to these classes.
+            apps.all_models.pop(schema.id, None)
+        apps.clear_cache()
+
+    yield
+
+    with django_db_blocker.unblock():
+        _drop_dataset_tables(schemas)
+
+
 @pytest.fixture()
 def filled_router(
     router,
+    dynamic_tables,
     afval_dataset,
     bommen_dataset,
     parkeervakken_dataset,
@@ -96,45 +172,22 @@ def filled_router(
     router.reload()
     router_urls = [p.name for p in router.urls]
     assert len(router_urls) > 1, router_urls
-
-    # Make sure the tables are created too
-    table_names = connection.introspection.table_names()
-
-    datasets = {
-        afval_dataset: "afval_containers",
-        bommen_dataset: "bommen_bommen",
-        parkeervakken_dataset: "parkeervakken_parkeervakken",
-        bagh_dataset: "bagh_buurt",
-        vestiging_dataset: "vestiging_vestiging",
-        fietspaaltjes_dataset: "fietsplaatjes_fietsplaatjes",
-        fietspaaltjes_dataset_no_display: "fietspaaltjesnodisplay_fietspaaltjesnodisplay",
-        explosieven_dataset: "explosieven_verdachtgebied",
-        indirect_self_ref_dataset: "selfref_selfref",
-    }
-
-    # Based on datasets, create test table if not exists
-    for dataset, table in datasets.items():
-        if table not in table_names:
-            create_tables(dataset.schema)
     return router
 
 
 @pytest.fixture()
 def afval_schema_json() -> dict:
-    path = HERE / "files/afval.json"
-    return json.loads(path.read_text())
+    return read_schema_file("afval.json")
 
 
 @pytest.fixture()
 def afval_schema_backwards_embedded_json() -> dict:
-    path = HERE / "files/afval_backwards_embedded.json"
-    return json.loads(path.read_text())
+    return read_schema_file("afval_backwards_embedded.json")
 
 
 @pytest.fixture()
 def afval_schema_backwards_summary_json() -> dict:
-    path = HERE / "files/afval_backwards_summary.json"
-    return json.loads(path.read_text())
+    return read_schema_file("afval_backwards_summary.json")
 
 
 @pytest.fixture()
@@ -194,8 +247,7 @@ def afval_container(afval_container_model, afval_cluster):
 @pytest.fixture()
 def bommen_schema_json() -> dict:
     """Fixture to return the schema json for """
-    path = HERE / "files/bommen.json"
-    return json.loads(path.read_text())
+    return read_schema_file("bommen.json")
 
 
 @pytest.fixture()
@@ -211,8 +263,7 @@ def bommen_dataset(bommen_schema_json) -> Dataset:
 @pytest.fixture()
 def brp_schema_json() -> dict:
     """Fixture for the BRP dataset"""
-    path = HERE / "files/brp.json"
-    return json.loads(path.read_text())
+    return read_schema_file("brp.json")
 
 
 @pytest.fixture()
@@ -257,8 +308,7 @@ def location() -> Location:
 
 @pytest.fixture()
 def parkeervakken_schema_json() -> dict():
-    path = HERE / "files/parkeervakken.json"
-    return json.loads(path.read_text())
+    return read_schema_file("parkeervakken.json")
 
 
 @pytest.fixture()
@@ -287,8 +337,7 @@ def parkeervakken_regime_model(filled_router):
 
 @pytest.fixture()
 def bagh_schema_json() -> dict():
-    path = HERE / "files/bagh.json"
-    return json.loads(path.read_text())
+    return read_schema_file("bagh.json")
 
 
 @pytest.fixture()
@@ -355,8 +404,7 @@ def bagh_wijk(bagh_wijk_model, bagh_stadsdeel):
 
 @pytest.fixture()
 def vestiging_schema_json() -> dict():
-    path = HERE / "files/vestiging.json"
-    return json.loads(path.read_text())
+    return read_schema_file("vestiging.json")
 
 
 @pytest.fixture()
@@ -436,16 +484,26 @@ def fetch_tokendata():
     return _fetcher
 
 
+#: Signed tokens per scopes, these are reused while they're valid long enough.
+_auth_tokens = {}
+
+
 @pytest.fixture
 def fetch_auth_token(fetch_tokendata):
     """ Fixture to create an auth token, scopes is flexible """
 
     def _fetcher(scopes):
-        kid = "2aedafba-8170-4064-b704-ce92b7c89cc6"
-        key = jwks.get_keyset().get_key(kid)
-        token = JWT(header={"alg": "ES256", "kid": kid}, claims=fetch_tokendata(scopes))
-        token.make_signed_token(key)
-        return token.serialize()
+        cache_key = tuple(scopes)
+        token, expires = _auth_tokens.get(cache_key, (None, 0))
+        if expires - time.time() < 15:
+            kid = "2aedafba-8170-4064-b704-ce92b7c89cc6"
+            key = jwks.get_keyset().get_key(kid)
+            claims = fetch_tokendata(scopes)
+            jwt = JWT(header={"alg": "ES256", "kid": kid}, claims=claims)
+            jwt.make_signed_token(key)
+            token = jwt.serialize()
+            _auth_tokens[cache_key] = (token, claims["exp"])
+        return token
 
     return _fetcher
 
@@ -467,8 +525,7 @@ def fietspaaltjes_model(filled_router):
 @pytest.fixture()
 def fietspaaltjes_schema_json() -> dict:
     """Fixture to return the schema json for """
-    path = HERE / "files/fietspaaltjes.json"
-    return json.loads(path.read_text())
+    return read_schema_file("fietspaaltjes.json")
 
 
 @pytest.fixture()
@@ -519,8 +576,7 @@ def fietspaaltjes_model_no_display(filled_router):
 @pytest.fixture()
 def fietspaaltjes_schema_json_no_display() -> dict:
     """Fixture to return the schema json for """
-    path = HERE / "files/fietspaaltjes_no_display.json"
-    return json.loads(path.read_text())
+    return read_schema_file("fietspaaltjes_no_display.json")
 
 
 @pytest.fixture()
@@ -563,8 +619,7 @@ def fietspaaltjes_data_no_display(fietspaaltjes_model_no_display):
 @pytest.fixture()
 def explosieven_schema_json() -> dict:
     """ Fixture to return the schema json for """
-    path = HERE / "files/explosieven.json"
-    return json.loads(path.read_text())
+    return read_schema_file("explosieven.json")
 
 
 @pytest.fixture()
@@ -596,8 +651,7 @@ def explosieven_data(explosieven_model):
 
 @pytest.fixture()
 def indirect_self_ref_schema_json() -> dict():
-    path = HERE / "files/indirect-self-ref.json"
-    return json.loads(path.read_text())
+    return read_schema_file("indirect-self-ref.json")
 
 
 @pytest.fixture()
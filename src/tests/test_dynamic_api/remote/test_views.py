@@ -2,8 +2,11 @@ import orjson
 import pytest
 import urllib3
 from urllib3_mock import Responses
+from django.core.cache import cache
 from django.urls import reverse
 
+from dso_api.dynamic_api.remote.views import RemoteViewSet, del_none
+
 DEFAULT_RESPONSE = {
     "naam": {
         "voornamen": "Ria",
@@ -130,6 +133,64 @@ def test_remote_detail_view(api_client, router, brp_dataset, urllib3_mocker, tes
     assert response.json() == local_response, response.data
 
 
+@pytest.mark.django_db
+def test_remote_detail_view_endpoint_without_slash(
+    api_client, router, brp_dataset, urllib3_mocker
+):
+    """Prove that detail URLs are built when the endpoint has no trailing slash."""
+    brp_dataset.endpoint_url = brp_dataset.endpoint_url.rstrip("/")
+    brp_dataset.save()
+    router.reload()
+    urllib3_mocker.add(
+        "GET",
+        "/unittest/brp/ingeschrevenpersonen/999990901",
+        body=orjson.dumps(DEFAULT_RESPONSE),
+        content_type="application/json",
+    )
+
+    url = reverse(
+        "dynamic_api:brp-ingeschrevenpersonen-detail", kwargs={"pk": "999990901"}
+    )
+    response = api_client.get(url)
+    assert response.status_code == 200, response.data
+
+
+@pytest.mark.django_db
+def test_remote_detail_view_not_modified(
+    api_client, router, brp_dataset, urllib3_mocker, settings
+):
+    """Prove that a conditional GET reuses the cached remote response."""
+    settings.REMOTE_CACHE_ENABLED = True
+    remote_response, local_response = SUCCESS_TESTS["default"]
+    router.reload()
+
+    def _conditional_get(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, ""
+        return 200, {"ETag": '"v1"'}, orjson.dumps(remote_response)
+
+    urllib3_mocker.add_callback(
+        "GET",
+        "/unittest/brp/ingeschrevenpersonen/999990901",
+        callback=_conditional_get,
+        content_type="application/json",
+    )
+
+    url = reverse(
+        "dynamic_api:brp-ingeschrevenpersonen-detail", kwargs={"pk": "999990901"}
+    )
+    try:
+        for _ in range(2):
+            response = api_client.get(url)
+            assert response.status_code == 200, response.data
+            assert response.json() == local_response, response.data
+    finally:
+        cache.clear()
+
+    statuses = [call.response.status for call in urllib3_mocker.calls]
+    assert statuses == [200, 304]
+
+
 @pytest.mark.django_db
 def test_remote_schema_validation(api_client, router, brp_dataset, urllib3_mocker):
     """Prove that the schema is validated."""
@@ -287,3 +348,34 @@ def test_remote_timeout(api_client, router, brp_dataset, urllib3_mocker):
         "detail": "Connection failed (server timeout)",
         "status": 504,
     }, response.data
+
+
+def test_headers_passthrough_subclass():
+    """Prove that subclasses get the META keys of their own passthrough headers."""
+
+    class CustomViewSet(RemoteViewSet):
+        headers_passthrough = ("Authorization", "Accept-Crs")
+
+    assert CustomViewSet.headers_passthrough_meta == (
+        ("HTTP_AUTHORIZATION", "Authorization"),
+        ("HTTP_ACCEPT_CRS", "Accept-Crs"),
+    )
+    assert RemoteViewSet.headers_passthrough_meta == (
+        ("HTTP_AUTHORIZATION", "Authorization"),
+    )
+
+
+def test_del_none():
+    """Prove that None values are removed from nested objects too."""
+    data = {
+        "naam": "Ria",
+        "leeftijd": None,
+        "geboorte": {"datum": None, "land": "NL"},
+        "adressen": [{"huisnummer": "6", "toevoeging": None}, "extra"],
+    }
+    del_none(data)
+    assert data == {
+        "naam": "Ria",
+        "geboorte": {"land": "NL"},
+        "adressen": [{"huisnummer": "6"}, "extra"],
+    }
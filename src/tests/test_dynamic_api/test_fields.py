@@ -10,6 +10,7 @@ from dso_api.dynamic_api.utils import split_on_separator
         ("aa.bb.cc", ["aa.bb", "cc"]),
         ("aa_bb.cc", ["aa_bb", "cc"]),
         ("aa.bb_cc", ["aa.bb", "cc"]),
+        ("aabb", ["aabb"]),
     ],
 )
 def test_split(instr, result):
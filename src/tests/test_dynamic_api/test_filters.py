@@ -395,6 +395,21 @@ class TestDynamicFilterSet:
         )
         assert len(response.data["_embedded"]["parkeervakken"]) == 1
 
+        response = APIClient().get(
+            "/v1/parkeervakken/parkeervakken/",
+            data={"geometry[contains]": "POINT(121137 489047)"},
+            headers={"Accept-CRS": 28992},
+        )
+        assert len(response.data["_embedded"]["parkeervakken"]) == 1
+
+        # Python's float() accepts this, but it's not a valid coordinate for WKT.
+        response = APIClient().get(
+            "/v1/parkeervakken/parkeervakken/",
+            data={"geometry[contains]": "52.388_231,4.8897865"},
+            headers={"Accept-CRS": 4326},
+        )
+        assert response.status_code == 400, response.data
+
     @staticmethod
     def test_filter_isempty(parkeervakken_parkeervak_model):
         parkeervakken_parkeervak_model.objects.create(
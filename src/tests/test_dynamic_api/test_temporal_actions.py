@@ -183,3 +183,35 @@ class TestViews:
         assert response.data["stadsdeel"].endswith(expected_url), response.data[
             "stadsdeel"
         ]
+
+    def test_serializer_links_keep_format_parameter(
+        self, api_client, filled_router, bagh_schema, bagh_gebieden
+    ):
+        """ Prove that only the links of a ?format= request get that parameter,
+        and that the version is added to it."""
+        url = reverse("dynamic_api:bagh-ggw_gebied-list")
+        response = api_client.get("{}{}/?format=json".format(url, bagh_gebieden.id))
+
+        expected_url = "/{}/?format=json&volgnummer=002".format(
+            bagh_gebieden.stadsdeel.identificatie
+        )
+        assert response.data["stadsdeel"].endswith(expected_url), response.data[
+            "stadsdeel"
+        ]
+
+        response = api_client.get("{}{}/".format(url, bagh_gebieden.id))
+        assert "format=" not in response.data["stadsdeel"], response.data["stadsdeel"]
+
+    def test_serializer_links_use_request_host(
+        self, api_client, filled_router, bagh_schema, bagh_gebieden
+    ):
+        """ Prove that the links of each request use the host of that request."""
+        url = reverse("dynamic_api:bagh-ggw_gebied-list")
+        for host in ("api1.example.com", "api2.example.com"):
+            response = api_client.get(
+                "{}{}/".format(url, bagh_gebieden.id), HTTP_HOST=host
+            )
+
+            assert response.data["stadsdeel"].startswith(
+                f"http://{host}/"
+            ), response.data["stadsdeel"]
@@ -1,25 +1,30 @@
 import pytest
-from django.db import connection
 from django.urls import reverse
 
-from rest_framework_dso.crs import CRS, RD_NEW
+from rest_framework_dso.crs import CRS, ETRS89, RD_NEW
 from schematools.contrib.django import models
-from schematools.contrib.django.db import create_tables
+from dso_api.dynamic_api.middleware import DatasetMiddleware
 from dso_api.dynamic_api.permissions import (
     fetch_scopes_for_dataset_table,
     fetch_scopes_for_model,
 )
+from dso_api.dynamic_api.views import DynamicApiViewSet
 
 
-@pytest.fixture(autouse=True)
-def clear_caches():
-    yield  # run tests first
+@pytest.fixture()
+def clear_scope_caches():
+    """Make sure the auth settings from the database are read by the test.
+    The caches are also cleared afterwards, so other tests don't see the changes.
+    """
+    fetch_scopes_for_dataset_table.cache_clear()
+    fetch_scopes_for_model.cache_clear()
+    yield
     fetch_scopes_for_dataset_table.cache_clear()
     fetch_scopes_for_model.cache_clear()
 
 
 @pytest.mark.django_db
-def test_list_dynamic_view(api_client, api_rf, router, bommen_dataset):
+def test_list_dynamic_view(api_client, api_rf, router, dynamic_tables, bommen_dataset):
     """Prove that building the router also creates the available viewsets."""
     router_urls = [p.name for p in router.urls]
     assert router_urls == ["api-root"]
@@ -28,17 +33,13 @@ def test_list_dynamic_view(api_client, api_rf, router, bommen_dataset):
     router.reload()
     assert len(router.urls) > 1
 
-    # Make sure the tables are created too
-    if "bommen_bommen" not in connection.introspection.table_names():
-        create_tables(bommen_dataset.schema)
-
     # Prove that URLs can now be resolved.
     url = reverse("dynamic_api:bommen-bommen-list")
 
     # Prove that the view is available and works
     response = api_client.get(url)
     assert response.status_code == 200, response.data
-    assert response.json() == {
+    assert response.data == {
         "_links": {
             "self": {"href": "http://testserver/v1/bommen/bommen/"},
             "next": {"href": None},
@@ -57,6 +58,20 @@ def test_filled_router(api_client, filled_router):
     assert response.status_code == 200, response.data
 
 
+@pytest.mark.django_db
+def test_dataset_middleware_model_only_viewset(api_rf, afval_container_model):
+    """Prove that a viewset subclass that only sets the model also gets the dataset."""
+
+    class ContainerViewSet(DynamicApiViewSet):
+        model = afval_container_model
+
+    request = api_rf.get("/v1/afvalwegingen/containers/")
+    view_func = ContainerViewSet.as_view({"get": "list"})
+    DatasetMiddleware(get_response=None).process_view(request, view_func, (), {})
+
+    assert request.dataset is afval_container_model._dataset_schema
+
+
 @pytest.mark.django_db
 def test_list_dynamic_view_unregister(api_client, api_rf, filled_router):
     """Prove that unregistering"""
@@ -103,17 +118,7 @@ class TestDSOViewMixin:
         response = api_client.get(url, HTTP_ACCEPT_CRS="EPSG:4258")
         assert response.status_code == 200, response.data
         assert response.has_header("Content-Crs"), dict(response.items())
-        assert CRS.from_string("EPSG:4258") == CRS.from_string(response["Content-Crs"])
-
-    def test_response_has_crs_from_accept_crs_empty_data(
-        self, api_client, filled_router
-    ):
-        """Prove that response has a CRS header taken from the Accept-Crs header """
-        url = reverse("dynamic_api:afvalwegingen-containers-list")
-        response = api_client.get(url, HTTP_ACCEPT_CRS="EPSG:4258")
-        assert response.status_code == 200, response.data
-        assert response.has_header("Content-Crs"), dict(response.items())
-        assert CRS.from_string("EPSG:4258") == CRS.from_string(response["Content-Crs"])
+        assert ETRS89 == CRS.from_string(response["Content-Crs"])
 
     def test_response_has_crs_from_content(
         self, api_client, filled_router, afval_container
@@ -126,38 +131,31 @@ class TestDSOViewMixin:
         assert RD_NEW == CRS.from_string(response["Content-Crs"])
 
 
-# TODO: Make parametrized, too much repetion. JJM
 @pytest.mark.django_db
+@pytest.mark.usefixtures("clear_scope_caches")
 class TestAuth:
     """ Test authorization """
 
-    def test_auth_on_dataset_schema_protects_containers(
-        self, api_client, filled_router, afval_schema
-    ):
-        """ Prove that auth protection at dataset level leads to a 403 on the container listview.
-        """
-        url = reverse("dynamic_api:afvalwegingen-containers-list")
-        models.Dataset.objects.filter(name="afvalwegingen").update(auth="BAG/R")
-        response = api_client.get(url)
-        assert response.status_code == 403, response.data
-
-    def test_auth_on_dataset_schema_protects_cluster(
-        self, api_client, filled_router, afval_schema
-    ):
-        """ Prove that auth protection at dataset level leads to a 403 on the cluster listview.
-        """
-        url = reverse("dynamic_api:afvalwegingen-clusters-list")
-        models.Dataset.objects.filter(name="afvalwegingen").update(auth="BAG/R")
-        response = api_client.get(url)
-        assert response.status_code == 403, response.data
-
-    def test_auth_on_table_schema_protects(
-        self, api_client, filled_router, afval_schema
+    @pytest.mark.parametrize(
+        ["url_name", "args", "model", "name"],
+        [
+            # auth protection at dataset level leads to a 403 on the listviews
+            ("afvalwegingen-containers-list", [], models.Dataset, "afvalwegingen"),
+            ("afvalwegingen-clusters-list", [], models.Dataset, "afvalwegingen"),
+            # auth protection at table level leads to a 403 on the listview
+            ("afvalwegingen-containers-list", [], models.DatasetTable, "containers"),
+            # protection at datasets and table level protects detail views
+            ("afvalwegingen-containers-detail", [1], models.Dataset, "afvalwegingen"),
+            ("afvalwegingen-containers-detail", [1], models.DatasetTable, "containers"),
+        ],
+    )
+    def test_auth_protects_views(
+        self, api_client, filled_router, url_name, args, model, name
     ):
-        """ Prove that auth protection at table level (container) leads to a 403 on the container listview.
+        """ Prove that auth protection at dataset or table level leads to a 403.
         """
-        url = reverse("dynamic_api:afvalwegingen-containers-list")
-        models.DatasetTable.objects.filter(name="containers").update(auth="BAG/R")
+        url = reverse(f"dynamic_api:{url_name}", args=args)
+        model.objects.filter(name=name).update(auth="BAG/R")
         response = api_client.get(url)
         assert response.status_code == 403, response.data
 
@@ -242,11 +240,8 @@ class TestAuth:
         token = fetch_auth_token(["BAG/R"])
         response = api_client.get(url, HTTP_AUTHORIZATION=f"Bearer {token}")
         assert response.status_code == 200, response.data
-        assert "eigenaarNaam" in set(
-            [
-                field_name
-                for field_name in response.data["_embedded"]["containers"][0].keys()
-            ]
+        assert (
+            "eigenaarNaam" in response.data["_embedded"]["containers"][0]
         ), response.data["_embedded"]["containers"][0].keys()
 
     def test_auth_on_individual_fields_with_token_for_valid_scope_per_profile(
@@ -275,11 +270,8 @@ class TestAuth:
         token = fetch_auth_token(["BRK/RO", "BRK/RSN"])
         response = api_client.get(url, HTTP_AUTHORIZATION=f"Bearer {token}")
         assert response.status_code == 200, response.data
-        assert "eigenaarNaam" in set(
-            [
-                field_name
-                for field_name in response.data["_embedded"]["containers"][0].keys()
-            ]
+        assert (
+            "eigenaarNaam" in response.data["_embedded"]["containers"][0]
         ), response.data["_embedded"]["containers"][0].keys()
 
     def test_auth_on_individual_fields_without_token_for_valid_scope(
@@ -291,11 +283,8 @@ class TestAuth:
         models.DatasetField.objects.filter(name="eigenaar_naam").update(auth="BAG/R")
         response = api_client.get(url)
         assert response.status_code == 200, response.data
-        assert "eigenaarNaam" not in set(
-            [
-                field_name
-                for field_name in response.data["_embedded"]["containers"][0].keys()
-            ]
+        assert (
+            "eigenaarNaam" not in response.data["_embedded"]["containers"][0]
         ), response.data
 
     def test_auth_on_field_level_is_not_cached(
@@ -308,11 +297,6 @@ class TestAuth:
     ):
         """ Prove that Auth is not cached.
         """
-        # Router reload is needed to make sure that viewsets are using relations.
-        from dso_api.dynamic_api.urls import router
-
-        router.reload()
-
         url = reverse("dynamic_api:parkeervakken-parkeervakken-list")
 
         models.DatasetField.objects.filter(name="dagen").update(auth="BAG/R")
@@ -345,37 +329,13 @@ class TestAuth:
         token = fetch_auth_token(["BAG/R"])
         response = api_client.get(url, HTTP_AUTHORIZATION=f"Bearer {token}")
 
-        assert (
-            "dagen"
-            in response.data["_embedded"]["parkeervakken"][0]["regimes"][0].keys()
-        )
+        regime = response.data["_embedded"]["parkeervakken"][0]["regimes"][0]
+        assert "dagen" in regime, regime
 
         public_response = api_client.get(url)
 
-        assert (
-            "dagen"
-            not in public_response.data["_embedded"]["parkeervakken"][0]["regimes"][
-                0
-            ].keys()
-        )
-
-    def test_auth_on_dataset_protects_detail_view(
-        self, api_client, filled_router, afval_schema, fetch_auth_token, afval_container
-    ):
-        """ Prove that protection at datasets level protects detail views """
-        url = reverse("dynamic_api:afvalwegingen-containers-detail", args=[1])
-        models.Dataset.objects.filter(name="afvalwegingen").update(auth="BAG/R")
-        response = api_client.get(url)
-        assert response.status_code == 403, response.data
-
-    def test_auth_on_datasettable_protects_detail_view(
-        self, api_client, filled_router, afval_schema, fetch_auth_token, afval_container
-    ):
-        """ Prove that protection at datasets level protects detail views """
-        url = reverse("dynamic_api:afvalwegingen-containers-detail", args=[1])
-        models.DatasetTable.objects.filter(name="containers").update(auth="BAG/R")
-        response = api_client.get(url)
-        assert response.status_code == 403, response.data
+        regime = public_response.data["_embedded"]["parkeervakken"][0]["regimes"][0]
+        assert "dagen" not in regime, regime
 
     def test_auth_on_dataset_detail_with_token_for_valid_scope(
         self, api_client, filled_router, afval_schema, fetch_auth_token, afval_container
@@ -408,7 +368,7 @@ class TestAuth:
         assert len(response.data["_embedded"]["containers"]) == 1, response.data
 
     def test_sort_by_not_accepting_db_column_names(
-        self, api_client, filled_router, afval_schema, afval_container
+        self, api_client, filled_router, afval_schema
     ):
         """ Prove that _sort is not accepting db column names.
         """
@@ -21,6 +21,7 @@ class TestWildcard:
         assert self.wildcard_escape("fo%o") == r"fo\%o"
         assert self.wildcard_escape("fo%o_") == r"fo\%o\_"
         assert self.wildcard_escape("f?_oob%ar*") == r"f_\_oob\%ar%"
+        assert self.wildcard_escape(r"fo\%o*") == r"fo\\\%o%"
 
     @pytest.mark.django_db
     def test_like_filter_sql(self, django_assert_num_queries):